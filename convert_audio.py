@@ -1,21 +1,28 @@
 """
-Simple audio converter using pydub (which can use alternative backends)
-Converts m4a to wav format
+Simple audio converter using ffmpeg directly
+Converts m4a to wav format (16kHz mono, 16-bit PCM)
 """
-from pydub import AudioSegment
+import subprocess
 import sys
 
 def convert_m4a_to_wav(input_file, output_file):
     """Convert m4a to wav"""
     try:
-        print(f"Loading {input_file}...")
-        audio = AudioSegment.from_file(input_file, format="m4a")
-        
-        print(f"Converting to wav...")
-        audio.export(output_file, format="wav")
+        print(f"Converting {input_file} to wav...")
+        subprocess.run(
+            ["ffmpeg", "-y", "-i", input_file,
+             "-ac", "1", "-ar", "16000", "-c:a", "pcm_s16le",
+             output_file],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
         
         print(f"Successfully converted to {output_file}")
         return True
+    except subprocess.CalledProcessError as e:
+        print(f"Error: ffmpeg failed: {e.stderr.decode(errors='replace').strip()}")
+        return False
     except Exception as e:
         print(f"Error: {e}")
         return False
@@ -4,11 +4,31 @@ Creates structured dataset with metadata in CSV/JSONL format.
 """
 import os
 import json
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from pathlib import Path
 from datetime import datetime
 
 
+# Counter file in output_dir holding the next dataset version number
+NEXT_VERSION_FILE = '.next_version'
+
+# Column types for reading dataset.csv back. Arrow writes whole floats as
+# "3" rather than "3.0", so type inference alone can turn them into ints
+CSV_DTYPES = {
+    'duration_seconds': 'float64',
+    'sample_rate': 'int32',
+    'language': 'category',
+    'confidence': 'float64',
+    'word_count': 'int32',
+    'segments': 'int32',
+    'original_duration': 'float64',
+    'trimmed_duration': 'float64',
+}
+
+
 def create_dataset_metadata(filtered_samples, output_dir, version):
     """
     Create structured dataset with metadata.
@@ -21,53 +41,82 @@ def create_dataset_metadata(filtered_samples, output_dir, version):
     Returns:
         Dataset metadata dictionary
     """
-    dataset_records = []
-    
-    for sample in filtered_samples:
-        filename = sample['filename']
-        preproc = sample['preprocessing']
-        transcr = sample['transcription']
-        
-        record = {
-            'sample_id': Path(filename).stem,
-            'filename': filename,
-            'audio_path': preproc.get('output_path', ''),
-            'transcription': transcr.get('text', ''),
-            'duration_seconds': preproc.get('final_duration', 0),
-            'sample_rate': preproc.get('sample_rate', 16000),
-            'language': transcr.get('language', 'unknown'),
-            'confidence': transcr.get('confidence', 0.0),
-            'word_count': transcr.get('word_count', 0),
-            'segments': transcr.get('segments', 0),
-            'original_duration': preproc.get('original_duration', 0),
-            'trimmed_duration': preproc.get('original_duration', 0) - preproc.get('final_duration', 0),
-        }
-        
-        dataset_records.append(record)
-    
-    # Create DataFrame
-    df = pd.DataFrame(dataset_records)
+    filenames = [sample['filename'] for sample in filtered_samples]
+    preproc = [sample['preprocessing'] for sample in filtered_samples]
+    transcr = [sample['transcription'] for sample in filtered_samples]
+    
+    # Build the DataFrame column by column
+    df = pd.DataFrame({
+        'sample_id': [Path(filename).stem for filename in filenames],
+        'filename': filenames,
+        'audio_path': [p.get('output_path', '') for p in preproc],
+        'transcription': [t.get('text', '') for t in transcr],
+        'duration_seconds': np.array([p.get('final_duration', 0) for p in preproc], dtype=np.float64),
+        'sample_rate': np.array([p.get('sample_rate', 16000) for p in preproc], dtype=np.int32),
+        'language': pd.Categorical([t.get('language', 'unknown') for t in transcr]),
+        'confidence': np.array([t.get('confidence', 0.0) for t in transcr], dtype=np.float64),
+        'word_count': np.array([t.get('word_count', 0) for t in transcr], dtype=np.int32),
+        'segments': np.array([t.get('segments', 0) for t in transcr], dtype=np.int32),
+        'original_duration': np.array([p.get('original_duration', 0) for p in preproc], dtype=np.float64),
+    })
+    df['trimmed_duration'] = df['original_duration'] - df['duration_seconds']
     
     # Sort by sample_id
     df = df.sort_values('sample_id').reset_index(drop=True)
     
-    # Calculate dataset statistics
+    # Calculate dataset statistics (one array pull per column)
+    durations = df['duration_seconds'].to_numpy()
+    word_counts = df['word_count'].to_numpy()
+    confidences = df['confidence'].to_numpy()
+    
     stats = {
         'version': version,
         'created_at': datetime.now().isoformat(),
         'total_samples': int(len(df)),
-        'total_duration_seconds': float(df['duration_seconds'].sum()),
-        'total_words': int(df['word_count'].sum()),
-        'avg_duration': float(df['duration_seconds'].mean()),
-        'avg_confidence': float(df['confidence'].mean()),
+        'total_duration_seconds': float(durations.sum()),
+        'total_words': int(word_counts.sum()),
+        'avg_duration': float(durations.mean()),
+        'avg_confidence': float(confidences.mean()),
         'languages': {str(k): int(v) for k, v in df['language'].value_counts().to_dict().items()},
-        'min_duration': float(df['duration_seconds'].min()),
-        'max_duration': float(df['duration_seconds'].max()),
+        'min_duration': float(durations.min()),
+        'max_duration': float(durations.max()),
     }
     
     return df, stats
 
 
+def update_next_version(output_dir, version):
+    """
+    Record the version after this one so the next run doesn't rescan output_dir.
+    
+    Args:
+        output_dir: Output directory
+        version: Version identifier that was just saved
+    """
+    version_file = Path(output_dir) / NEXT_VERSION_FILE
+    next_version = int(version) + 1
+    
+    # Never move the counter backwards (e.g. when re-saving an old version)
+    if version_file.exists():
+        try:
+            next_version = max(next_version, int(version_file.read_text()))
+        except ValueError:
+            pass
+    else:
+        # First counter in this directory: start past every existing version
+        for item in Path(output_dir).iterdir():
+            if item.is_dir() and item.name.startswith('dataset_v'):
+                try:
+                    next_version = max(next_version, int(item.name.replace('dataset_v', '')) + 1)
+                except ValueError:
+                    continue
+    
+    # Write to a temp file and swap it in so readers never see a partial value
+    tmp_file = version_file.with_suffix('.tmp')
+    tmp_file.write_text(str(next_version))
+    os.replace(tmp_file, version_file)
+
+
 def save_dataset(df, stats, output_dir, version):
     """
     Save dataset in multiple formats with versioning.
@@ -85,15 +134,16 @@ def save_dataset(df, stats, output_dir, version):
     version_dir = Path(output_dir) / f"dataset_v{version}"
     version_dir.mkdir(parents=True, exist_ok=True)
     
-    # Save CSV
+    # Save CSV (serialized by Arrow's C++ writer; read back with CSV_DTYPES)
     csv_path = version_dir / "dataset.csv"
-    df.to_csv(csv_path, index=False)
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), str(csv_path))
     
     # Save JSONL (one JSON object per line)
     jsonl_path = version_dir / "dataset.jsonl"
+    records = df.to_dict(orient='records')
     with open(jsonl_path, 'w', encoding='utf-8') as f:
-        for _, row in df.iterrows():
-            json.dump(row.to_dict(), f, ensure_ascii=False)
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
             f.write('\n')
     
     # Save statistics
@@ -103,27 +153,32 @@ def save_dataset(df, stats, output_dir, version):
     
     # Save human-readable summary
     summary_path = version_dir / "README.txt"
+    summary = []
+    summary.append(f"Dataset Version {version}\n")
+    summary.append("=" * 60 + "\n\n")
+    summary.append(f"Created: {stats['created_at']}\n\n")
+    summary.append("Statistics:\n")
+    summary.append(f"  Total samples: {stats['total_samples']}\n")
+    summary.append(f"  Total duration: {stats['total_duration_seconds']:.2f} seconds ({stats['total_duration_seconds']/60:.2f} minutes)\n")
+    summary.append(f"  Total words: {stats['total_words']}\n")
+    summary.append(f"  Average duration: {stats['avg_duration']:.2f} seconds\n")
+    summary.append(f"  Average confidence: {stats['avg_confidence']:.2f}\n")
+    summary.append(f"  Duration range: {stats['min_duration']:.2f}s - {stats['max_duration']:.2f}s\n")
+    summary.append(f"\nLanguages:\n")
+    for lang, count in stats['languages'].items():
+        summary.append(f"  {lang}: {count} samples\n")
+    summary.append("\n" + "=" * 60 + "\n")
+    summary.append("\nSample preview:\n")
+    for row in df.head(5).itertuples(index=False):
+        summary.append(f"\n[{row.sample_id}]\n")
+        summary.append(f"  Duration: {row.duration_seconds:.2f}s\n")
+        summary.append(f"  Confidence: {row.confidence:.2f}\n")
+        summary.append(f"  Transcription: {row.transcription[:100]}...\n")
+    
     with open(summary_path, 'w', encoding='utf-8') as f:
-        f.write(f"Dataset Version {version}\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"Created: {stats['created_at']}\n\n")
-        f.write("Statistics:\n")
-        f.write(f"  Total samples: {stats['total_samples']}\n")
-        f.write(f"  Total duration: {stats['total_duration_seconds']:.2f} seconds ({stats['total_duration_seconds']/60:.2f} minutes)\n")
-        f.write(f"  Total words: {stats['total_words']}\n")
-        f.write(f"  Average duration: {stats['avg_duration']:.2f} seconds\n")
-        f.write(f"  Average confidence: {stats['avg_confidence']:.2f}\n")
-        f.write(f"  Duration range: {stats['min_duration']:.2f}s - {stats['max_duration']:.2f}s\n")
-        f.write(f"\nLanguages:\n")
-        for lang, count in stats['languages'].items():
-            f.write(f"  {lang}: {count} samples\n")
-        f.write("\n" + "=" * 60 + "\n")
-        f.write("\nSample preview:\n")
-        for idx, row in df.head(5).iterrows():
-            f.write(f"\n[{row['sample_id']}]\n")
-            f.write(f"  Duration: {row['duration_seconds']:.2f}s\n")
-            f.write(f"  Confidence: {row['confidence']:.2f}\n")
-            f.write(f"  Transcription: {row['transcription'][:100]}...\n")
+        f.write(''.join(summary))
+    
+    update_next_version(output_dir, version)
     
     print(f"\nDataset saved to: {version_dir}")
     print(f"  - CSV: {csv_path.name}")
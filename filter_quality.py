@@ -5,6 +5,16 @@ Implements two filtering mechanisms:
 2. Transcription quality filtering (remove low confidence, empty, or nonsensical text)
 """
 import re
+from pathlib import Path
+
+
+# Compiled once at import; used to check for meaningful (alphabetic) content
+_ALPHA_RE = re.compile(r'[a-zA-Z]')
+
+
+def _lookup_key(filename):
+    # Bare, case-folded filename so paths from different stages still match
+    return Path(filename).name.lower()
 
 
 def filter_by_duration(sample, min_duration=2.0, max_duration=300.0):
@@ -42,14 +52,21 @@ def filter_by_transcription_quality(sample, min_confidence=0.3, min_words=3):
         return False, f"Too few words: {word_count} < {min_words}"
     
     # Check for meaningful content (at least some alphabetic characters)
-    if not re.search(r'[a-zA-Z]', text):
+    if not _ALPHA_RE.search(text):
         return False, "No alphabetic characters found"
     
     # Check for excessive repetition (same word repeated many times)
+    # Stops scanning as soon as enough distinct words have been seen to pass
     words = text.lower().split()
-    if len(words) > 0:
-        unique_ratio = len(set(words)) / len(words)
-        if unique_ratio < 0.3 and len(words) > 5:
+    total = len(words)
+    if total > 5:
+        seen = set()
+        for word in words:
+            seen.add(word)
+            if len(seen) / total >= 0.3:
+                break
+        else:
+            unique_ratio = len(seen) / total
             return False, f"Excessive repetition detected (unique ratio: {unique_ratio:.2f})"
     
     return True, "Quality OK"
@@ -81,15 +98,17 @@ def apply_filters(samples, preprocess_results, transcription_results,
         'reasons': []
     }
 
-    # Create lookup dictionaries (case-insensitive)
-    preprocess_dict = {r['output_file'].lower(): r for r in preprocess_results if r.get('success')}
-    transcribe_dict = {r['filename'].lower(): r for r in transcription_results}
+    # Create lookup dictionaries (case-insensitive, keyed by bare filename)
+    preprocess_dict = {_lookup_key(r['output_file']): r for r in preprocess_results if r.get('success')}
+    transcribe_dict = {_lookup_key(r['filename']): r for r in transcription_results}
+    
+    # Compute lookup keys once up front rather than per iteration
+    sample_keys = [_lookup_key(sample) for sample in samples]
     
-    for sample in samples:
+    for sample, sample_key in zip(samples, sample_keys):
         # Get preprocessing and transcription data (case-insensitive lookup)
-        sample_lower = sample.lower()
-        preproc = preprocess_dict.get(sample_lower, {})
-        transcr = transcribe_dict.get(sample_lower, {})
+        preproc = preprocess_dict.get(sample_key, {})
+        transcr = transcribe_dict.get(sample_key, {})
         
         # Skip if no transcription data found (file wasn't processed)
         if not transcr:
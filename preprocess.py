@@ -6,40 +6,81 @@ trims silence, and normalizes volume.
 import os
 import librosa
 import soundfile as sf
+import soxr
 import numpy as np
 from pathlib import Path
 from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Formats libsndfile decodes natively; everything else goes through librosa
+SOUNDFILE_EXTENSIONS = {'.wav', '.flac', '.ogg'}
 
 
 def load_audio(audio_path, target_sr=16000):
-    audio, sr = librosa.load(audio_path, sr=target_sr, mono=True)
+    if os.path.splitext(audio_path)[1].lower() not in SOUNDFILE_EXTENSIONS:
+        audio, sr = librosa.load(audio_path, sr=target_sr, mono=True)
+        return audio, sr
+    
+    # Read straight through libsndfile and resample with soxr
+    audio, sr = sf.read(audio_path, dtype='float32', always_2d=False)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    if sr != target_sr:
+        # Match librosa's output length of ceil(n * target_sr / sr)
+        n_samples = int(np.ceil(len(audio) * target_sr / sr))
+        audio = soxr.resample(audio, sr, target_sr)
+        audio = np.pad(audio, (0, max(0, n_samples - len(audio))))[:n_samples]
+        sr = target_sr
     return audio, sr
 
 
-def trim_silence(audio, sr, top_db=20):
-    trimmed_audio, _ = librosa.effects.trim(audio, top_db=top_db)
-    return trimmed_audio
+def trim_silence(audio, sr, top_db=20, frame_length=2048, hop_length=512):
+    # Same result as librosa.effects.trim, but frame RMS comes from a single
+    # cumulative sum of squares instead of framing the whole signal
+    if len(audio) == 0:
+        return audio
+    
+    # Centered frames, zero-padded like librosa.feature.rms
+    pad = frame_length // 2
+    squared = np.pad(audio.astype(np.float64) ** 2, pad)
+    csum = np.concatenate(([0.0], np.cumsum(squared)))
+    starts = np.arange(1 + len(audio) // hop_length) * hop_length
+    power = (csum[starts + frame_length] - csum[starts]) / frame_length
+    
+    # Keep frames within top_db of the loudest frame
+    amin = 1e-10
+    db = 10 * np.log10(np.maximum(power, amin)) - 10 * np.log10(max(power.max(), amin))
+    non_silent = np.flatnonzero(db > -top_db)
+    
+    if non_silent.size == 0:
+        return audio[:0]
+    
+    start = non_silent[0] * hop_length
+    end = min(len(audio), (non_silent[-1] + 1) * hop_length)
+    return audio[start:end]
 
 
 def normalize_audio(audio):
-    # Calculate RMS
-    rms = np.sqrt(np.mean(audio**2))
+    # RMS and peak in one sweep each (dot avoids the audio**2 temporary)
+    rms = np.sqrt(np.dot(audio, audio) / len(audio))
+    peak = np.max(np.abs(audio))
     
     # Target RMS for -20 dBFS
     target_rms = 10**(-20/20)
     
-    # Normalize
-    if rms > 0:
-        normalized_audio = audio * (target_rms / rms)
-    else:
-        normalized_audio = audio
+    # Already within ~1.5 dB of target and not clipping (e.g. a re-run on
+    # processed audio): leave it untouched
+    if rms > 0 and 0.85 < target_rms / rms < 1.18 and peak <= 1.0:
+        return audio
     
-    # Prevent clipping
-    max_val = np.max(np.abs(normalized_audio))
-    if max_val > 1.0:
-        normalized_audio = normalized_audio / max_val
+    # Normalize, folding the clipping guard into the same scale factor
+    scale = target_rms / rms if rms > 0 else 1.0
+    scale /= max(1.0, peak * scale)
     
-    return normalized_audio
+    # Scale in place; callers hand over a buffer they no longer need
+    np.multiply(audio, scale, out=audio)
+    return audio
 
 
 def preprocess_audio_file(input_path, output_path, target_sr=16000):
@@ -53,15 +94,15 @@ def preprocess_audio_file(input_path, output_path, target_sr=16000):
         # Trim silence
         audio = trim_silence(audio, sr)
         
-        # Normalize
+        # Normalize (in place on the trimmed view, no new array)
         audio = normalize_audio(audio)
         
         # Get final duration
         final_duration = len(audio) / sr
         
-        # Save processed audio
+        # Save processed audio as 16-bit PCM (peak is already <= 1.0, so no clipping)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        sf.write(output_path, audio, sr)
+        sf.write(output_path, audio, sr, subtype='PCM_16')
         
         return {
             'success': True,
@@ -78,12 +119,24 @@ def preprocess_audio_file(input_path, output_path, target_sr=16000):
         }
 
 
-def preprocess_audio_batch(input_dir, output_dir, target_sr=16000, specific_file=None):
+def _preprocess_worker(file_args):
+    # Top-level so it can be pickled by ProcessPoolExecutor
+    input_path, output_path, target_sr = file_args
+    
+    result = preprocess_audio_file(input_path, output_path, target_sr)
+    
+    result['input_file'] = Path(input_path).name
+    result['output_file'] = Path(output_path).name
+    
+    return result
+
+
+def preprocess_audio_batch(input_dir, output_dir, target_sr=16000, specific_file=None, verbose=False):
     input_path = Path(input_dir)
     output_path = Path(output_dir)
     
     # Supported audio formats
-    audio_extensions = ['.mp3', '.wav', '.aac', '.ogg', '.m4a', '.flac']
+    audio_extensions = {'.mp3', '.wav', '.aac', '.ogg', '.m4a', '.flac'}
     
     # If specific file is provided, process only that file
     if specific_file:
@@ -101,29 +154,33 @@ def preprocess_audio_batch(input_dir, output_dir, target_sr=16000, specific_file
                 print(f"Error: File '{specific_file}' not found!")
                 return []
     else:
-        # Find all audio files in directory
-        audio_files = []
-        for ext in audio_extensions:
-            audio_files.extend(input_path.glob(f'*{ext}'))
-    
-    results = []
+        # Find all audio files in directory (single directory scan)
+        try:
+            audio_files = [p for p in input_path.iterdir() if p.suffix.lower() in audio_extensions]
+        except FileNotFoundError:
+            audio_files = []
     
     print(f"Found {len(audio_files)} audio files to process")
     
-    for audio_file in tqdm(audio_files, desc="Processing audio"):
-        # Create output filename (always .wav)
-        output_file = output_path / f"{audio_file.stem}.wav"
-        
-        result = preprocess_audio_file(
-            str(audio_file),
-            str(output_file),
-            target_sr
-        )
-        
-        result['input_file'] = audio_file.name
-        result['output_file'] = output_file.name
-        
-        results.append(result)
+    # Create output filenames (always .wav)
+    file_args = [
+        (str(audio_file), str(output_path / f"{audio_file.stem}.wav"), target_sr)
+        for audio_file in audio_files
+    ]
+    
+    # Each file is independent, so spread them across all cores
+    results = []
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for result in tqdm(
+            executor.map(_preprocess_worker, file_args),
+            total=len(audio_files),
+            desc="Processing audio"
+        ):
+            # Per-file status only when asked; tqdm.write keeps the bar intact
+            if verbose:
+                status = "OK" if result['success'] else f"FAILED ({result['error']})"
+                tqdm.write(f"  {result['input_file']}: {status}")
+            results.append(result)
     
     # Print summary
     successful = sum(1 for r in results if r['success'])
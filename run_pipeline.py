@@ -3,7 +3,7 @@ Audio Dataset Pipeline - Main Orchestrator
 End-to-end pipeline for converting raw audio files into a structured STT dataset.
 
 Usage:
-    python run_pipeline.py [--version VERSION] [--model-size MODEL]
+    python run_pipeline.py [--version VERSION] [--model-size MODEL] [--backend BACKEND]
     
 Example:
     python run_pipeline.py --version 1 --model-size base
@@ -11,6 +11,7 @@ Example:
 import os
 import sys
 import argparse
+import logging
 from pathlib import Path
 from datetime import datetime
 
@@ -20,6 +21,8 @@ import transcribe
 import filter_quality
 import create_dataset
 
+logger = logging.getLogger(__name__)
+
 
 def get_next_version(output_dir):
     """
@@ -35,7 +38,20 @@ def get_next_version(output_dir):
     if not output_path.exists():
         return 1
     
-    # Find existing version directories
+    # Fast path: counter maintained by create_dataset.save_dataset
+    version_file = output_path / create_dataset.NEXT_VERSION_FILE
+    if version_file.exists():
+        try:
+            version = int(version_file.read_text())
+        except ValueError:
+            pass
+        else:
+            # Never hand out a version whose directory already exists
+            while (output_path / f"dataset_v{version}").exists():
+                version += 1
+            return version
+    
+    # Fall back to scanning for existing version directories
     existing_versions = []
     for item in output_path.iterdir():
         if item.is_dir() and item.name.startswith('dataset_v'):
@@ -56,12 +72,14 @@ def run_pipeline(raw_audio_dir="raw_audio",
                 output_dir="output",
                 version=None,
                 model_size="base",
+                backend="faster-whisper",
                 min_duration=2.0,
                 max_duration=300.0,
                 min_confidence=0.3,
                 min_words=3,
                 language=None,
-                input_file=None):
+                input_file=None,
+                verbose=False):
     """
     Run the complete audio dataset pipeline.
     
@@ -77,12 +95,14 @@ def run_pipeline(raw_audio_dir="raw_audio",
         output_dir: Directory for final dataset
         version: Dataset version (auto-increments if None)
         model_size: Whisper model size (tiny/base/small/medium/large)
+        backend: Whisper inference backend (see transcribe.BACKENDS)
         min_duration: Minimum audio duration in seconds
         max_duration: Maximum audio duration in seconds
         min_confidence: Minimum transcription confidence
         min_words: Minimum word count
         language: Target language code (None for auto-detect)
         input_file: Process only this specific file (optional)
+        verbose: Show per-file preprocessing status
     
     Returns:
         Dictionary with pipeline results
@@ -109,7 +129,8 @@ def run_pipeline(raw_audio_dir="raw_audio",
         raw_audio_dir,
         processed_audio_dir,
         target_sr=16000,
-        specific_file=input_file
+        specific_file=input_file,
+        verbose=verbose
     )
     
     if not preprocess_results:
@@ -128,7 +149,8 @@ def run_pipeline(raw_audio_dir="raw_audio",
     transcription_results = transcribe.transcribe_batch(
         processed_audio_dir,
         model_size=model_size,
-        language=language
+        language=language,
+        backend=backend
     )
     
     if not transcription_results:
@@ -143,9 +165,10 @@ def run_pipeline(raw_audio_dir="raw_audio",
     # Get list of processed files
     processed_files = [r['output_file'] for r in successful_preprocess]
     
-    # Debug: Show what we're filtering
-    print(f"Processed files to filter: {processed_files}")
-    print(f"Transcription results available: {[r['filename'] for r in transcription_results]}")
+    # Debug: Show what we're filtering (--verbose)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Processed files to filter: {processed_files}")
+        logger.debug(f"Transcription results available: {[r['filename'] for r in transcription_results]}")
     
     filtered_samples, filter_report = filter_quality.apply_filters(
         processed_files,
@@ -213,10 +236,12 @@ def main():
 Examples:
   python run_pipeline.py
   python run_pipeline.py --version 2 --model-size small
+  python run_pipeline.py --backend openai
   python run_pipeline.py --min-duration 3 --min-confidence 0.5
   python run_pipeline.py --language en
   python run_pipeline.py --input-file test2.mp3
   python run_pipeline.py --input-file "C:\\path\\to\\audio\\test2.mp3"
+  python run_pipeline.py --verbose
         """
     )
     
@@ -259,6 +284,13 @@ Examples:
         help='Whisper model size (default: base)'
     )
     
+    parser.add_argument(
+        '--backend',
+        choices=transcribe.BACKENDS,
+        default='faster-whisper',
+        help='Whisper inference backend (default: faster-whisper)'
+    )
+    
     parser.add_argument(
         '--min-duration',
         type=float,
@@ -293,8 +325,21 @@ Examples:
         help='Target language code (e.g., en, es, fr). Auto-detect if not specified.'
     )
     
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Show per-file status and debug diagnostics'
+    )
+    
     args = parser.parse_args()
     
+    # Configure only this module's logger; a root level would also turn on
+    # the per-file INFO logs of faster-whisper and numba's DEBUG dumps
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    
     # Run pipeline
     result = run_pipeline(
         raw_audio_dir=args.raw_audio_dir,
@@ -302,12 +347,14 @@ Examples:
         output_dir=args.output_dir,
         version=args.version,
         model_size=args.model_size,
+        backend=args.backend,
         min_duration=args.min_duration,
         max_duration=args.max_duration,
         min_confidence=args.min_confidence,
         min_words=args.min_words,
         language=args.language,
-        input_file=args.input_file
+        input_file=args.input_file,
+        verbose=args.verbose
     )
     
     if result is None:
@@ -1,62 +1,816 @@
 """
 Transcription Module
-Uses OpenAI Whisper for automatic speech recognition.
+Uses Whisper for automatic speech recognition, via faster-whisper
+(CTranslate2) by default or the reference OpenAI implementation.
 """
 import os
-import whisper
+import sys
+import time
+import queue
+import shutil
+import hashlib
+import threading
+import functools
+import contextlib
+import subprocess
+import numpy as np
+import soundfile as sf
 from pathlib import Path
 from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 
-def load_whisper_model(model_size="base"):
-    print(f"Loading Whisper model ({model_size})...")
-    model = whisper.load_model(model_size)
+# Inference backends accepted by load_whisper_model
+BACKENDS = ['faster-whisper', 'openai', 'trt_llm', 'whisper.cpp', 'onnx', 'hqq']
+
+# Built TensorRT-LLM engines, one directory per model size
+TRT_ENGINE_DIR = Path.home() / '.cache' / 'whisper_trt'
+
+# Exported int8 ONNX models, one directory per model size
+ONNX_MODEL_DIR = Path.home() / '.cache' / 'whisper_onnx'
+
+
+def _quantize_int8(model):
+    # Dynamic int8 quantization of the Linear layers (FBGEMM kernels, CPU only)
+    import torch
+    import whisper
+    
+    # whisper.model.Linear only adds a dtype cast for fp16, which an fp32 CPU
+    # model never needs; make them plain nn.Linear so quantize_dynamic swaps them
+    for module in model.modules():
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
+    
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _cuda_available(backend):
+    if backend in ("whisper.cpp", "onnx"):
+        return False  # CPU-only builds
+    if backend == "faster-whisper":
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count() > 0
+    import torch
+    return torch.cuda.is_available()
+
+
+class TRTLLMWhisper:
+    """
+    Whisper running on a TensorRT-LLM engine with int8 weight-only
+    quantization (GPU only).
+    
+    Engines are built on first use with the build.py script from
+    TensorRT-LLM's examples/whisper directory, which must be given in the
+    TRTLLM_WHISPER_DIR environment variable, and cached under TRT_ENGINE_DIR.
+    The engine reports no per-segment no_speech_prob and does no language
+    detection, so results carry no segments and default to English.
+    """
+    
+    def __init__(self, model_size):
+        import tensorrt_llm  # noqa: F401 - fail early if TensorRT-LLM is missing
+        
+        example_dir = os.environ.get('TRTLLM_WHISPER_DIR')
+        if not example_dir:
+            raise ImportError("TRTLLM_WHISPER_DIR is not set to TensorRT-LLM's examples/whisper directory")
+        
+        engine_dir = TRT_ENGINE_DIR / f"whisper_{model_size}_woq8"
+        if not engine_dir.exists():
+            print(f"Building TensorRT-LLM engine in {engine_dir} (one-time)...")
+            # Build next to the final directory and move it into place only
+            # once complete, so an interrupted build is redone next time
+            partial_dir = engine_dir.with_name(engine_dir.name + '.partial')
+            shutil.rmtree(partial_dir, ignore_errors=True)
+            subprocess.run(
+                [sys.executable, "build.py",
+                 "--model_name", model_size,
+                 "--output_dir", str(partial_dir),
+                 "--use_gpt_attention_plugin",
+                 "--use_gemm_plugin",
+                 "--use_bert_attention_plugin",
+                 "--use_weight_only"],
+                cwd=example_dir,
+                check=True
+            )
+            os.replace(partial_dir, engine_dir)
+        
+        # The example's runner is the supported way to drive these engines
+        sys.path.insert(0, example_dir)
+        from run import WhisperTRTLLM, decode_wav_file
+        
+        self._model = WhisperTRTLLM(str(engine_dir))
+        self._decode_wav_file = decode_wav_file
+    
+    def transcribe(self, audio_path, language=None):
+        language = language or 'en'
+        text_prefix = f"<|startoftranscript|><|{language}|><|transcribe|><|notimestamps|>"
+        results, _ = self._decode_wav_file(audio_path, self._model, text_prefix=text_prefix)
+        text = ' '.join(results[0][2])
+        return {'text': text, 'language': language, 'segments': []}
+
+
+class WhisperCppModel:
+    """
+    Whisper running on whisper.cpp (GGML, Q8_0 weights) through pywhispercpp.
+    
+    The quantized ggml-{size}-q8_0.bin checkpoint is downloaded on first use.
+    whisper.cpp exposes no no_speech_prob, so each segment's mean token
+    probability stands in for it (no_speech_prob = 1 - probability).
+    """
+    
+    # GGML checkpoint names differ from Whisper's for the large model
+    MODEL_NAMES = {'large': 'large-v2'}
+    
+    def __init__(self, model_size, num_threads):
+        from pywhispercpp.model import Model
+        
+        self.num_threads = num_threads
+        name = self.MODEL_NAMES.get(model_size, model_size)
+        self._model = Model(f"{name}-q8_0", n_threads=num_threads)
+    
+    def transcribe(self, audio_path, language=None):
+        if language is None:
+            (language, _), _ = self._model.auto_detect_language(audio_path, n_threads=self.num_threads)
+        
+        segments = self._model.transcribe(audio_path, language=language, extract_probability=True)
+        return {
+            'text': ''.join(s.text for s in segments),
+            'language': language,
+            'segments': [
+                {'text': s.text, 'no_speech_prob': 1.0 - float(s.probability)}
+                for s in segments
+            ]
+        }
+
+
+def export_onnx_model(model_size):
+    """
+    Export and int8-quantize openai/whisper-{model_size} for ONNX Runtime
+    into ONNX_MODEL_DIR (once), returning the model directory.
+    
+    Each process exports into its own temporary directory which is then
+    renamed into place, so an interrupted export is redone next time and
+    concurrent exports can't clobber each other; if another process got
+    there first, its copy is kept.
+    """
+    model_dir = ONNX_MODEL_DIR / f"whisper_{model_size}_int8"
+    if model_dir.exists():
+        return model_dir
+    
+    from optimum.onnxruntime import ORTModelForSpeechSeq2Seq, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import WhisperProcessor
+    
+    print(f"Exporting int8 ONNX model to {model_dir} (one-time)...")
+    model_id = f"openai/whisper-{model_size}"
+    partial_dir = model_dir.with_name(f"{model_dir.name}.partial-{os.getpid()}")
+    shutil.rmtree(partial_dir, ignore_errors=True)
+    try:
+        model = ORTModelForSpeechSeq2Seq.from_pretrained(model_id, export=True, use_merged=False)
+        model.save_pretrained(partial_dir)
+        WhisperProcessor.from_pretrained(model_id).save_pretrained(partial_dir)
+        
+        # Weights to int8, activations quantized on the fly
+        config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        for name in ['encoder_model', 'decoder_model', 'decoder_with_past_model']:
+            quantizer = ORTQuantizer.from_pretrained(partial_dir, file_name=f"{name}.onnx")
+            quantizer.quantize(save_dir=partial_dir, quantization_config=config)
+        
+        try:
+            os.replace(partial_dir, model_dir)
+        except OSError:
+            if not model_dir.exists():
+                raise
+            # Another process finished its export first; use that one
+    finally:
+        shutil.rmtree(partial_dir, ignore_errors=True)
+    return model_dir
+
+
+class ONNXWhisper:
+    """
+    Whisper running on ONNX Runtime (CPU) with int8 dynamically quantized
+    encoder and decoders, through Hugging Face Optimum.
+    
+    openai/whisper-{size} is exported and quantized on first use (see
+    export_onnx_model) and cached under ONNX_MODEL_DIR. The pipeline reports
+    no per-segment no_speech_prob, so results carry no segments; without a
+    language it still auto-detects one, but reports it as 'unknown'.
+    """
+    
+    def __init__(self, model_size, num_threads):
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        from transformers import WhisperProcessor, pipeline
+        
+        model_dir = export_onnx_model(model_size)
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = num_threads
+        model = ORTModelForSpeechSeq2Seq.from_pretrained(
+            model_dir,
+            provider="CPUExecutionProvider",
+            session_options=session_options,
+            use_merged=False,
+            encoder_file_name="encoder_model_quantized.onnx",
+            decoder_file_name="decoder_model_quantized.onnx",
+            decoder_with_past_file_name="decoder_with_past_model_quantized.onnx"
+        )
+        processor = WhisperProcessor.from_pretrained(model_dir)
+        self._pipe = pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            chunk_length_s=30
+        )
+    
+    def transcribe(self, audio_path, language=None):
+        # Without a language, generate detects it itself (but doesn't report it)
+        generate_kwargs = {'task': 'transcribe'}
+        if language:
+            generate_kwargs['language'] = language
+        
+        # Preprocessed WAVs are already 16 kHz mono, so skip the ffmpeg decode
+        samples, sample_rate = sf.read(audio_path, dtype='float32')
+        result = self._pipe(
+            {'raw': samples, 'sampling_rate': sample_rate},
+            generate_kwargs=generate_kwargs
+        )
+        return {'text': result['text'], 'language': language or 'unknown', 'segments': []}
+
+
+def _load_openai(model_size, num_threads):
+    import torch
+    import whisper
+    
+    device = "cuda" if _cuda_available("openai") else "cpu"
+    model = whisper.load_model(model_size, device=device)
+    if device == "cpu":
+        torch.set_num_threads(num_threads)
+        model = _quantize_int8(model)
+    # fp16 only pays off with tensor cores (Volta+); Pascal is slower in fp16
+    model.fp16 = device == "cuda" and torch.cuda.get_device_capability()[0] >= 7
+    if device == "cuda" and _torch_version() >= (2, 1):
+        model.encoder = _compile_encoder(model.encoder)
+    # All of this model's GPU work runs on one stream, so input copies can
+    # be queued without waiting on the default stream
+    model.cuda_stream = torch.cuda.Stream() if device == "cuda" else None
+    return model
+
+
+def _load_hqq(model_size, num_threads):
+    # openai-whisper with every Linear layer's weights held in 4 bits (HQQ,
+    # groups of 64) and dequantized on the fly, for memory-constrained hosts
+    import torch
+    import whisper
+    from hqq.core.quantize import BaseQuantizeConfig, HQQLinear
+    
+    device = "cuda" if _cuda_available("hqq") else "cpu"
+    model = whisper.load_model(model_size, device=device)
+    if device == "cpu":
+        torch.set_num_threads(num_threads)
+    model.fp16 = device == "cuda" and torch.cuda.get_device_capability()[0] >= 7
+    
+    quant_config = BaseQuantizeConfig(nbits=4, group_size=64)
+    compute_dtype = torch.float16 if model.fp16 else torch.float32
+    for module in list(model.modules()):
+        for name, child in module.named_children():
+            if isinstance(child, torch.nn.Linear):
+                setattr(module, name, HQQLinear(child, quant_config,
+                                                compute_dtype=compute_dtype, device=device))
+    model.cuda_stream = torch.cuda.Stream() if device == "cuda" else None
+    return model
+
+
+def _on_model_stream(model):
+    # Context running CUDA work on the model's own stream (no-op on CPU)
+    stream = getattr(model, 'cuda_stream', None)
+    if stream is None:
+        return contextlib.nullcontext()
+    import torch
+    return torch.cuda.stream(stream)
+
+
+def _torch_version():
+    import torch
+    return tuple(int(part) for part in torch.__version__.split('+')[0].split('.')[:2])
+
+
+def _compile_encoder(encoder):
+    # Fuse the encoder's attention/MLP blocks and replay them as CUDA graphs.
+    # Its input is always a padded 30 s mel (3000 frames), but the batch
+    # size varies from 1 to BATCH_SIZE. With automatic dynamic shapes the
+    # first batch size > 1 recompiles once with a symbolic batch dimension
+    # (warm_up_model does both compiles) instead of recompiling per size.
+    # The decoder is left eager: its input grows each step and its kv-cache
+    # relies on forward hooks.
+    import torch
+    import torch._dynamo
+    
+    # Fall back to eager instead of failing a transcription if compilation breaks
+    torch._dynamo.config.suppress_errors = True
+    return torch.compile(encoder, mode="reduce-overhead", fullgraph=False, dynamic=None)
+
+
+def _load_faster_whisper(model_size, num_threads):
+    import ctranslate2
+    from faster_whisper import WhisperModel
+    
+    if _cuda_available("faster-whisper"):
+        device = "cuda"
+        supported = ctranslate2.get_supported_compute_types("cuda")
+        compute_type = "int8_float16" if "int8_float16" in supported else "int8"
+    else:
+        # CTranslate2 int8 kernels are much faster than PyTorch fp32 on CPU
+        device, compute_type = "cpu", "int8"
+    return WhisperModel(model_size, device=device, compute_type=compute_type,
+                        cpu_threads=num_threads)
+
+
+# Loaded models stay resident, so repeated transcribe_batch calls in one
+# process reuse the weights; unload_model() releases them
+@functools.lru_cache(maxsize=2)
+def load_whisper_model(model_size="base", backend="faster-whisper", num_threads=None):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' (expected one of: {', '.join(BACKENDS)})")
+    
+    # CPU threads for inference (default: all cores)
+    num_threads = num_threads or os.cpu_count()
+    
+    print(f"Loading Whisper model ({model_size}, {backend})...")
+    if backend == "trt_llm":
+        try:
+            model = TRTLLMWhisper(model_size)
+        except ImportError as e:
+            print(f"TensorRT-LLM unavailable ({e}); falling back to openai backend")
+            backend = "openai"
+    
+    if backend == "openai":
+        model = _load_openai(model_size, num_threads)
+    elif backend == "faster-whisper":
+        model = _load_faster_whisper(model_size, num_threads)
+    elif backend == "whisper.cpp":
+        model = WhisperCppModel(model_size, num_threads)
+    elif backend == "onnx":
+        model = ONNXWhisper(model_size, num_threads)
+    elif backend == "hqq":
+        model = _load_hqq(model_size, num_threads)
+        backend = "openai"  # Same model class, so the openai code paths apply
+    
+    # Remember which API this model speaks so transcribe_audio can dispatch
+    model.backend = backend
     print("Model loaded successfully")
     return model
 
 
-def transcribe_audio(model, audio_path, language=None):
+def unload_model():
+    """
+    Drop cached models (e.g. before switching sizes), free their GPU memory
+    and stop the CPU worker pool along with the models its workers hold.
+    """
+    load_whisper_model.cache_clear()
+    _shutdown_pool()
     try:
-        # Transcribe
+        import torch
+    except ImportError:
+        return
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+# Clips per batched decode, and the longest clip that fits one Whisper window
+BATCH_SIZE = 8
+MAX_WINDOW_DURATION = 30.0
+
+# Opt-in directory for cached mel spectrograms (unset: no caching). Only
+# useful when transcribe_batch reruns on unchanged audio: run_pipeline
+# rewrites the processed WAVs each run, which invalidates every entry
+MEL_CACHE_DIR = os.environ.get('WHISPER_MEL_CACHE')
+
+# Files decoded ahead of the model in the serial transcription loop
+PREFETCH_DEPTH = 2
+
+# Files between progress lines when stderr isn't a terminal
+PROGRESS_EVERY = 10
+
+
+class _Progress(tqdm):
+    """
+    Transcription progress bar, redrawn at most every 2 s. When stderr is
+    piped to a log there is no bar (and no control characters), just a
+    plain "done/total" line every PROGRESS_EVERY files.
+    """
+    
+    def __init__(self, total):
+        super().__init__(total=total, desc="Transcribing", mininterval=2.0,
+                         smoothing=0.1, disable=not sys.stderr.isatty())
+    
+    def update(self, n=1):
+        if not self.disable:
+            return super().update(n)
+        before, self.n = self.n, self.n + n
+        if self.n // PROGRESS_EVERY > before // PROGRESS_EVERY or self.n == self.total:
+            print(f"{self.n}/{self.total}")
+
+
+def _duration(audio_path):
+    # Header read only, no decode
+    try:
+        return sf.info(audio_path).duration
+    except Exception:
+        return float('inf')
+
+
+def _length_buckets(indices, durations, batch_size=BATCH_SIZE):
+    """
+    Split clip indices into full batches of batch_size, shortest first.
+    
+    Every clip is padded to the same 30 s mel, so the encoder cost depends
+    only on the batch count; sorting just keeps transcripts of similar length
+    (and so similar decoder step counts) together.
+    """
+    order = sorted(indices, key=lambda i: durations[i])
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def _short_clip_batches(audio_files, num_batches=1):
+    # Batches of clip indices that fit one window, spread over at least
+    # num_batches batches where there are enough clips
+    durations = [_duration(audio_file) for audio_file in audio_files]
+    short = [i for i, d in enumerate(durations) if d <= MAX_WINDOW_DURATION]
+    batch_size = max(1, min(BATCH_SIZE, -(-len(short) // num_batches)))
+    return _length_buckets(short, durations, batch_size)
+
+
+def _load_mel(model, audio_path):
+    """
+    Log-mel spectrogram of one padded 30 s window. With MEL_CACHE_DIR set it
+    is cached there so later runs skip the ffmpeg decode and STFT.
+    """
+    import torch
+    import whisper
+    
+    n_mels = model.dims.n_mels
+    if not MEL_CACHE_DIR:
+        audio = whisper.pad_or_trim(whisper.load_audio(audio_path))
+        return whisper.log_mel_spectrogram(audio, n_mels)
+    
+    # One entry per audio file, keyed on its absolute path
+    key = hashlib.sha1(os.path.abspath(audio_path).encode()).hexdigest()
+    cache_path = os.path.join(MEL_CACHE_DIR, f"{key}.mel.npy")
+    
+    # Reuse only if it is newer than the audio and has the model's mel bins
+    if (os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(audio_path)):
+        try:
+            mel = np.load(cache_path)
+            if mel.shape[0] == n_mels:
+                return torch.from_numpy(mel)
+        except (OSError, ValueError):
+            pass
+    
+    audio = whisper.pad_or_trim(whisper.load_audio(audio_path))
+    mel = whisper.log_mel_spectrogram(audio, n_mels)
+    try:
+        os.makedirs(MEL_CACHE_DIR, exist_ok=True)
+        np.save(cache_path, mel.numpy())
+    except OSError:
+        pass  # Unwritable cache directory; just don't cache
+    return mel
+
+
+def build_decoding_options(model, language=None):
+    """
+    DecodingOptions for single-window decodes with an openai-whisper model.
+    
+    Build once per batch and pass to transcribe_audio/transcribe_audio_batch;
+    this also loads the tokenizer for the language, which whisper caches.
+    """
+    import whisper
+    from whisper.tokenizer import get_tokenizer
+    
+    # Same arguments as whisper's DecodingTask, so it hits this cache entry
+    get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                  language=language or "en", task="transcribe")
+    return whisper.DecodingOptions(
+        language=language,
+        fp16=getattr(model, 'fp16', False),
+        without_timestamps=True
+    )
+
+
+def _decode_mels(model, mels, options):
+    import torch
+    import whisper
+    
+    batch = torch.stack(mels)
+    stream = getattr(model, 'cuda_stream', None)
+    if stream is None:
+        return whisper.decode(model, batch.to(model.device), options)
+    
+    # Page-locked host memory lets the copy run asynchronously on the stream
+    with torch.cuda.stream(stream):
+        results = whisper.decode(model, batch.pin_memory().to(model.device, non_blocking=True), options)
+    stream.synchronize()
+    return results
+
+
+def _load_input(model, audio_path):
+    """
+    Decode audio_path into what the model's backend consumes: a cached mel
+    for short clips or samples for long ones (openai), samples
+    (faster-whisper), or the path itself (wrapped engines).
+    """
+    backend = getattr(model, 'backend', 'openai')
+    if backend == 'openai':
+        if _duration(audio_path) <= MAX_WINDOW_DURATION:
+            return _load_mel(model, audio_path)
+        import whisper
+        return whisper.load_audio(audio_path)
+    if backend == 'faster-whisper':
+        from faster_whisper import decode_audio
+        return decode_audio(audio_path)
+    return audio_path
+
+
+def _prefetch_inputs(model, audio_paths):
+    """
+    Yield (audio_path, input) pairs while a background thread decodes the
+    next files, so decoding overlaps with inference on the current one.
+    A failed decode is yielded as the exception in place of the input.
+    """
+    prefetched = queue.Queue(maxsize=PREFETCH_DEPTH)
+    
+    def producer():
+        for audio_path in audio_paths:
+            try:
+                prefetched.put((audio_path, _load_input(model, audio_path)))
+            except Exception as e:
+                prefetched.put((audio_path, e))
+    
+    threading.Thread(target=producer, daemon=True).start()
+    for _ in audio_paths:
+        yield prefetched.get()
+
+
+def _transcribe_openai(model, audio, language, options):
+    # A clip that fits one window arrives as its (cached) mel; decode directly
+    if hasattr(audio, 'dim') and audio.dim() == 2:
+        result = _decode_mels(model, [audio], options or build_decoding_options(model, language))[0]
+        return result.text, result.language, result.no_speech_prob, 1
+    
+    with _on_model_stream(model):
         result = model.transcribe(
-            str(audio_path),
+            audio,
             language=language,
-            fp16=False  # Set to False for CPU compatibility
+            fp16=getattr(model, 'fp16', False)  # False on CPU and pre-Volta GPUs
         )
+    return (result['text'], result.get('language', 'unknown'),
+            *_sum_no_speech(result.get('segments', [])))
+
+
+def _transcribe_faster_whisper(model, audio, language):
+    segments, info = model.transcribe(
+        audio,
+        language=language,
+        beam_size=1,
+        vad_filter=True
+    )
+    # segments is a lazy generator; decoding happens while it is consumed,
+    # so accumulate as we go instead of holding every segment in memory
+    texts = []
+    no_speech_total = 0.0
+    n_segments = 0
+    for segment in segments:
+        texts.append(segment.text)
+        no_speech_total += segment.no_speech_prob
+        n_segments += 1
+    return ''.join(texts), info.language, no_speech_total, n_segments
+
+
+def warm_up_model(model, language=None):
+    """
+    Run one second of silence through the model so lazy initialisation
+    (kernel selection, CUDA context, caches) isn't charged to the first file.
+    Models are cached by load_whisper_model, so each is only warmed once.
+    """
+    backend = getattr(model, 'backend', 'openai')
+    if backend not in ('openai', 'faster-whisper') or getattr(model, 'warmed_up', False):
+        return  # Wrapped engines only accept file paths
+    
+    silence = np.zeros(16000, dtype=np.float32)
+    try:
+        if backend == 'openai':
+            import torch
+            with _on_model_stream(model):
+                model.transcribe(silence, language=language, fp16=getattr(model, 'fp16', False))
+                if hasattr(model.encoder, '_orig_mod'):
+                    # Compiled encoder: also trigger its batched (dynamic) compile
+                    dtype = torch.float16 if model.fp16 else torch.float32
+                    with torch.no_grad():
+                        model.encoder(torch.zeros(2, model.dims.n_mels, 3000,
+                                                  dtype=dtype, device=model.device))
+            if model.device.type == "cuda":
+                torch.cuda.synchronize()
+        else:
+            # VAD would drop pure silence and skip decoding, so disable it here
+            segments, _ = model.transcribe(silence, language=language, beam_size=1, vad_filter=False)
+            for _ in segments:
+                pass
+        model.warmed_up = True
+    except Exception as e:
+        print(f"Warm-up skipped: {e}")
+
+
+def _sum_no_speech(segments):
+    # (sum of no_speech_prob, segment count) for a list of segment dicts
+    probs = np.fromiter(
+        (s.get('no_speech_prob', 0.0) for s in segments),
+        dtype=np.float64,
+        count=len(segments)
+    )
+    return float(probs.sum()), len(segments)
+
+
+def _build_result(text, detected_language, no_speech_total, n_segments):
+    # Extract information
+    text = text.strip()
+    
+    # Calculate average confidence from segments
+    if n_segments:
+        # Whisper doesn't directly provide confidence, but we can use
+        # no_speech_prob as a proxy (lower is better)
+        confidence = 1.0 - no_speech_total / n_segments
+    else:
+        confidence = 0.5  # Default if no segments
+    
+    return {
+        'success': True,
+        'text': text,
+        'language': detected_language,
+        'confidence': confidence,
+        'word_count': len(text.split()),
+        'segments': n_segments
+    }
+
+
+def _failed_result(error):
+    return {
+        'success': False,
+        'error': str(error),
+        'text': '',
+        'confidence': 0.0
+    }
+
+
+def transcribe_audio(model, audio_path, language=None, audio=None, options=None):
+    try:
+        # Use the already-decoded input if the caller prefetched it
+        if audio is None:
+            audio = _load_input(model, audio_path)
+        elif isinstance(audio, Exception):
+            raise audio
         
-        # Extract information
-        text = result['text'].strip()
-        detected_language = result.get('language', 'unknown')
-        
-        # Calculate average confidence from segments
-        segments = result.get('segments', [])
-        if segments:
-            # Whisper doesn't directly provide confidence, but we can use
-            # no_speech_prob as a proxy (lower is better)
-            avg_no_speech_prob = sum(s.get('no_speech_prob', 0) for s in segments) / len(segments)
-            confidence = 1.0 - avg_no_speech_prob
+        # Transcribe
+        backend = getattr(model, 'backend', 'openai')
+        if backend == 'openai':
+            outputs = _transcribe_openai(model, audio, language, options)
+        elif backend == 'faster-whisper':
+            outputs = _transcribe_faster_whisper(model, audio, language)
         else:
-            confidence = 0.5  # Default if no segments
+            # Wrapped engines return an openai-whisper style result dict
+            result = model.transcribe(audio, language=language)
+            outputs = (result['text'], result['language'], *_sum_no_speech(result['segments']))
         
-        return {
-            'success': True,
-            'text': text,
-            'language': detected_language,
-            'confidence': confidence,
-            'word_count': len(text.split()),
-            'segments': len(segments)
-        }
+        return _build_result(*outputs)
     
     except Exception as e:
-        return {
-            'success': False,
-            'error': str(e),
-            'text': '',
-            'confidence': 0.0
-        }
+        return _failed_result(e)
+
+
+def transcribe_audio_batch(model, audio_paths, language=None, options=None):
+    """
+    Transcribe several clips of at most 30 seconds with one batched encoder
+    and decoder pass (openai backend only).
+    
+    Each clip becomes a single padded 30 s window (mel cached as for
+    transcribe_audio), decoded greedily without temperature fallback.
+    
+    Args:
+        model: Model returned by load_whisper_model(backend='openai')
+        audio_paths: Audio files, each no longer than 30 seconds
+        language: Optional language code
+        options: Prebuilt build_decoding_options(model, language), if any
+    
+    Returns:
+        List of transcription results, in the order of audio_paths
+    """
+    results = [None] * len(audio_paths)
+    
+    # Clips that fail to load get an error result; the rest are batched
+    mels, indices = [], []
+    for i, audio_path in enumerate(audio_paths):
+        try:
+            mels.append(_load_mel(model, audio_path))
+            indices.append(i)
+        except Exception as e:
+            results[i] = _failed_result(e)
+    
+    if mels:
+        try:
+            decoded = _decode_mels(model, mels, options or build_decoding_options(model, language))
+            for i, result in zip(indices, decoded):
+                results[i] = _build_result(result.text, result.language, result.no_speech_prob, 1)
+        except Exception as e:
+            for i in indices:
+                results[i] = _failed_result(e)
+    
+    return results
+
 
+# Threads each pool worker gives its model, so workers don't oversubscribe
+WORKER_THREADS = 4
 
-def transcribe_batch(audio_dir, model_size="base", language=None):
+# Per-process model and decoding options used by pool workers (set by _init_worker)
+_worker_model = None
+_worker_options = None
+
+
+def _fetch_weights(model_size, backend):
+    """
+    Download (or export) the model files for backend once, in this process.
+    
+    Pool workers all load their model at the same moment, and none of the
+    downloaders lock: parallel first-time downloads truncate each other's
+    checkpoint. Fetching before the pool starts leaves workers only
+    loading complete local files.
+    """
+    if backend in ("openai", "hqq", "trt_llm"):
+        # trt_llm falls back to openai-whisper without a GPU, which is the
+        # only case where it reaches the pool
+        import whisper
+        if model_size in whisper._MODELS:
+            default = os.path.join(os.path.expanduser("~"), ".cache")
+            root = os.path.join(os.getenv("XDG_CACHE_HOME", default), "whisper")
+            whisper._download(whisper._MODELS[model_size], root, False)
+    elif backend == "faster-whisper" and not os.path.isdir(model_size):
+        from faster_whisper import download_model
+        download_model(model_size)
+    elif backend == "whisper.cpp":
+        from pywhispercpp.utils import download_model
+        name = WhisperCppModel.MODEL_NAMES.get(model_size, model_size)
+        download_model(f"{name}-q8_0")
+    elif backend == "onnx":
+        export_onnx_model(model_size)
+
+
+# Worker pool kept across transcribe_batch calls, so its workers' models
+# stay loaded and warm, and the (model_size, backend, language) it serves
+_pool = None
+_pool_key = None
+_pool_workers = 0
+
+
+def _worker_pool(model_size, backend, language, num_workers):
+    # Reuse the running pool if it serves the same model and is big enough
+    global _pool, _pool_key, _pool_workers
+    key = (model_size, backend, language)
+    if _pool is None or _pool_key != key or _pool_workers < num_workers:
+        _shutdown_pool()
+        _fetch_weights(model_size, backend)
+        _pool = ProcessPoolExecutor(max_workers=num_workers,
+                                    initializer=_init_worker,
+                                    initargs=(model_size, backend, language))
+        _pool_key, _pool_workers = key, num_workers
+    return _pool
+
+
+def _shutdown_pool():
+    global _pool, _pool_key, _pool_workers
+    if _pool is not None:
+        _pool.shutdown()
+        _pool, _pool_key, _pool_workers = None, None, 0
+
+
+def _init_worker(model_size, backend, language):
+    global _worker_model, _worker_options
+    _worker_model = load_whisper_model(model_size, backend, num_threads=WORKER_THREADS)
+    warm_up_model(_worker_model, language)
+    if _worker_model.backend == "openai":
+        _worker_options = build_decoding_options(_worker_model, language)
+
+
+def _transcribe_worker(audio_files, language):
+    # Several files are a batch of short clips, decoded together where the
+    # model supports it; a single file may be of any length
+    if len(audio_files) > 1 and _worker_options is not None:
+        return transcribe_audio_batch(_worker_model, audio_files, language, options=_worker_options)
+    return [transcribe_audio(_worker_model, audio_file, language, options=_worker_options)
+            for audio_file in audio_files]
+
+
+def transcribe_batch(audio_dir, model_size="base", language=None, backend="faster-whisper",
+                     num_workers=None):
     """
     Transcribe all audio files in a directory.
     
@@ -64,39 +818,120 @@ def transcribe_batch(audio_dir, model_size="base", language=None):
         audio_dir: Directory containing audio files to transcribe
         model_size: Whisper model size
         language: Optional language code
+        backend: Inference backend (one of BACKENDS)
+        num_workers: Worker processes on CPU, each with its own model
+            (default: one per WORKER_THREADS cores; 1 disables the pool)
     
     Returns:
         List of transcription results
     """
-    audio_path = Path(audio_dir)
-    
-    # Load model once
-    model = load_whisper_model(model_size)
-    
-    # Find all wav files (should be preprocessed)
-    audio_files = list(audio_path.glob('*.wav'))
+    # Find all wav files (should be preprocessed); DirEntry.is_file() uses
+    # the file type from readdir, so this needs no stat per entry
+    try:
+        with os.scandir(audio_dir) as entries:
+            wav_entries = [
+                entry for entry in entries
+                if entry.name.endswith('.wav') and entry.is_file()
+            ]
+    except FileNotFoundError:
+        wav_entries = []
+    # Plain path strings all the way down; no Path objects per file
+    audio_files = [entry.path for entry in wav_entries]
     
     if not audio_files:
         print(f"No .wav files found in {audio_dir}")
         return []
     
-    results = []
+    # On CPU, run several single-model workers side by side; a GPU is
+    # already saturated by one model, so it keeps the serial loop
+    if num_workers is None:
+        num_workers = max(1, os.cpu_count() // WORKER_THREADS)
+    parallel = num_workers > 1 and len(audio_files) > 1 and not _cuda_available(backend)
     
     print(f"\nTranscribing {len(audio_files)} audio files...")
     
-    for audio_file in tqdm(audio_files, desc="Transcribing"):
-        result = transcribe_audio(model, audio_file, language)
-        result['filename'] = audio_file.name
-        result['audio_path'] = str(audio_file)
-        results.append(result)
+    if parallel:
+        num_workers = min(num_workers, len(audio_files))
+        results = [None] * len(audio_files)
+        
+        # openai-whisper models batch short clips inside each worker, in
+        # batches small enough to keep every worker busy
+        jobs = []
+        if backend in ("openai", "hqq"):
+            jobs = _short_clip_batches(audio_files, num_workers)
+        batched = {i for job in jobs for i in job}
+        jobs += [[i] for i in range(len(audio_files)) if i not in batched]
+        
+        executor = _worker_pool(model_size, backend, language, num_workers)
+        try:
+            futures = {
+                executor.submit(_transcribe_worker, [audio_files[i] for i in job], language): job
+                for job in jobs
+            }
+            with _Progress(len(audio_files)) as progress:
+                for future in as_completed(futures):
+                    job = futures[future]
+                    for i, result in zip(job, future.result()):
+                        results[i] = result
+                    progress.update(len(job))
+        except BrokenProcessPool:
+            _shutdown_pool()  # Start a fresh pool on the next call
+            raise
+    else:
+        # Load model once
+        model = load_whisper_model(model_size, backend)
+        
+        # Pay the cold-start cost up front when there's a batch to amortise it over
+        if len(audio_files) > 1 and not getattr(model, 'warmed_up', False):
+            start = time.perf_counter()
+            warm_up_model(model, language)
+            print(f"Model warmed up in {time.perf_counter() - start:.2f}s")
+        
+        results = [None] * len(audio_files)
+        
+        # openai-whisper can push several short clips through the encoder
+        # and decoder at once; longer files still go through transcribe_audio
+        buckets = []
+        options = None
+        if getattr(model, 'backend', None) == "openai":
+            # Same language for every file, so set up decoding once
+            options = build_decoding_options(model, language)
+        if options is not None and len(audio_files) > 1:
+            buckets = _short_clip_batches(audio_files)
+        
+        with _Progress(len(audio_files)) as progress:
+            for batch in buckets:
+                batch_results = transcribe_audio_batch(
+                    model, [audio_files[i] for i in batch], language, options=options
+                )
+                for i, result in zip(batch, batch_results):
+                    results[i] = result
+                progress.update(len(batch))
+            
+            # Remaining files one at a time, decoding the next ones meanwhile
+            remaining = [i for i in range(len(audio_files)) if results[i] is None]
+            prefetched = _prefetch_inputs(model, [audio_files[i] for i in remaining])
+            for i, (audio_file, audio) in zip(remaining, prefetched):
+                results[i] = transcribe_audio(model, audio_file, language, audio=audio, options=options)
+                progress.update(1)
+    
+    for entry, result in zip(wav_entries, results):
+        result['filename'] = entry.name
+        result['audio_path'] = entry.path
     
-    # Print summary
-    successful = sum(1 for r in results if r['success'])
+    # Print summary (one pass over the results)
+    successful = 0
+    total_confidence = 0.0
+    total_words = 0
+    for r in results:
+        if r['success']:
+            successful += 1
+            total_confidence += r['confidence']
+            total_words += r['word_count']
     print(f"\nTranscription complete: {successful}/{len(results)} files transcribed successfully")
     
     if successful > 0:
-        avg_confidence = sum(r['confidence'] for r in results if r['success']) / successful
-        total_words = sum(r['word_count'] for r in results if r['success'])
+        avg_confidence = total_confidence / successful
         print(f"Average confidence: {avg_confidence:.2f}")
         print(f"Total words transcribed: {total_words}")
     
@@ -117,4 +952,3 @@ if __name__ == "__main__":
             print(f"  Text: {result['text'][:100]}...")
             print(f"  Confidence: {result['confidence']:.2f}")
             print(f"  Language: {result['language']}")
-